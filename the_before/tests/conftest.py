@@ -0,0 +1,42 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pumpfun  # noqa: E402
+
+
+@pytest.fixture
+def bot(tmp_path):
+    """A PumpFunBot on a throwaway SQLite file with every network layer switched off."""
+    bot = pumpfun._bench_bot(str(tmp_path))
+    yield bot
+    bot.executors.shutdown(wait=False)
+    bot.db_engine.dispose()
+
+
+def raw_coin(i: int, migrated: datetime = None, **fields) -> dict:
+    """A migration payload that passes every filter except (possibly) the age rule."""
+    payload = {
+        "contractAddress": pumpfun.to_checksum(f"0x{i + 1:040x}"),
+        "token": {"name": f"Coin {i}", "symbol": f"C{i}"},
+        "creator": pumpfun.to_checksum(f"0x{i + 10**6:040x}"),
+        "migrationTime": (migrated or datetime(2024, 5, 1)).isoformat(),
+        "initialLiquidity": 50.0,
+        "feePercentage": 1.0,
+        "holderCount": 100,
+    }
+    payload.update(fields)
+    return payload
+
+
+async def serve(app) -> tuple:
+    """Start an aiohttp app on a free local port; returns (runner, base URL)."""
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    return runner, f"http://127.0.0.1:{runner.addresses[0][1]}"
@@ -0,0 +1,136 @@
+import asyncio
+import time
+from datetime import timedelta
+
+from telegram.error import NetworkError, RetryAfter
+
+import pumpfun
+
+
+class FakeTelegramBot:
+    """Stands in for telegram.Bot: records messages, can be slow or answer with errors first."""
+
+    def __init__(self, latency: float = 0.0, errors=()):
+        self.latency = latency
+        self.errors = list(errors)
+        self.messages = []
+        self.calls = 0
+
+    async def send_message(self, chat_id, text):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.errors:
+            raise self.errors.pop(0)
+        self.messages.append((chat_id, text))
+
+
+def alerts_in(messages) -> int:
+    total = 0
+    for _, text in messages:
+        header = text.split(" new alerts:", 1)[0]
+        total += int(header) if header.isdigit() else 1
+    return total
+
+
+def dispatch(fake, submit, settle: float = 0.0, **kwargs):
+    async def main():
+        dispatcher = pumpfun.AlertDispatcher(fake, "@channel", **kwargs)
+        submit(dispatcher)
+        dispatcher.start()
+        await asyncio.sleep(settle)
+        await dispatcher.stop()
+        return dispatcher
+
+    return asyncio.run(main())
+
+
+def test_burst_is_sent_as_digests():
+    fake = FakeTelegramBot()
+
+    def submit(dispatcher):
+        for i in range(30):
+            dispatcher.submit(f"coin {i}", key=f"0x{i:040x}")
+
+    dispatcher = dispatch(fake, submit, settle=0.2, per_minute=60, digest_max_items=10)
+    assert len(fake.messages) == 3
+    assert alerts_in(fake.messages) == 30
+    assert fake.messages[0][1].startswith("10 new alerts:")
+    stats = dispatcher.stats()
+    assert stats["digests"] == 3 and stats["sent_alerts"] == 30 and stats["queue_depth"] == 0
+
+
+def test_same_key_is_merged_into_latest_text():
+    fake = FakeTelegramBot()
+
+    def submit(dispatcher):
+        dispatcher.submit("score 40", key="0xabc")
+        dispatcher.submit("other coin", key="0xdef")
+        dispatcher.submit("score 75", key="0xabc")
+
+    dispatcher = dispatch(fake, submit, digest_max_items=1)
+    assert [text for _, text in fake.messages] == ["score 75", "other coin"]
+    assert dispatcher.merged == 1
+
+
+def test_retry_after_is_honoured():
+    fake = FakeTelegramBot(errors=[RetryAfter(0), RetryAfter(0)])
+
+    def submit(dispatcher):
+        dispatcher.submit("coin", key="0xabc")
+
+    started = time.monotonic()
+    dispatcher = dispatch(fake, submit)
+    assert fake.messages == [("@channel", "coin")]
+    assert dispatcher.retries == 2 and dispatcher.failed == 0
+    assert time.monotonic() - started < 1
+
+
+def test_retry_after_as_timedelta_and_other_errors():
+    error = RetryAfter(0)
+    error.retry_after = timedelta(milliseconds=50)
+    fake = FakeTelegramBot(errors=[error, NetworkError("down")])
+
+    def submit(dispatcher):
+        dispatcher.submit("lost", key="0xabc")
+        dispatcher.submit("kept", key="0xdef")
+
+    dispatcher = dispatch(fake, submit, digest_max_items=1)
+    assert [text for _, text in fake.messages] == ["kept"]
+    assert dispatcher.retries == 1 and dispatcher.failed == 1
+
+
+def test_stale_and_overflow_alerts_are_dropped():
+    fake = FakeTelegramBot()
+
+    def submit(dispatcher):
+        for i in range(8):
+            dispatcher.submit(f"coin {i}", key=f"0x{i:040x}")
+        time.sleep(0.1)
+        dispatcher.submit("fresh", key="0xfresh")
+
+    dispatcher = dispatch(fake, submit, max_queue=5, max_age=0.05)
+    assert dispatcher.dropped_overflow == 4
+    assert dispatcher.dropped_stale == 4
+    assert fake.messages == [("@channel", "fresh")]
+
+
+def test_send_telegram_alert_does_not_wait_for_telegram(bot):
+    fake = FakeTelegramBot(latency=0.5)
+
+    async def main():
+        bot.application = object()
+        bot.telegram_channel_id = "@channel"
+        dispatcher = bot.start_alert_dispatcher(fake)
+        started = time.perf_counter()
+        for i in range(20):
+            await bot.send_telegram_alert(f"coin {i}", key=f"0x{i:040x}")
+        submitted = time.perf_counter() - started
+        depth = dispatcher.queue_depth()
+        await dispatcher.stop()
+        return submitted, depth
+
+    submitted, depth = asyncio.run(main())
+    assert submitted < 0.1
+    assert depth > 0
+    assert alerts_in(fake.messages) == 20
+    assert fake.calls < 20
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+import pumpfun
+
+
+def transactions(contract: str, n: int, amount: float = 0.1):
+    return [{"contract_address": contract, "amount_eth": amount, "gas_price": 2e9} for _ in range(n)]
+
+
+def engine_with_rows(bot):
+    engine = pumpfun.TransactionAnomalyEngine(bot.db_engine, refit_interval=3600, refit_after=10, min_samples=2)
+    for i in range(6):
+        engine.ingest(transactions(f"0x{i:040x}", 5))
+    engine.ingest(transactions("0x" + "ff" * 20, 500, amount=50.0))
+    return engine
+
+
+def test_failed_fit_keeps_rows_dirty(bot, monkeypatch):
+    executors = pumpfun.Executors(cpu_workers=0, io_workers=2)
+    engine = engine_with_rows(bot)
+    fit = pumpfun.fit_anomaly_model
+
+    def failing_fit(*args):
+        # Rows that arrive while the fit runs must survive it either way
+        engine.ingest(transactions("0x" + "ee" * 20, 3))
+        raise MemoryError("worker died")
+
+    async def main():
+        monkeypatch.setattr(pumpfun, "fit_anomaly_model", failing_fit)
+        with pytest.raises(MemoryError):
+            await engine.refit_async(executors)
+        failed = (engine._dirty, engine.refits, engine.needs_refit())
+
+        def slow_fit(*args):
+            engine.ingest(transactions("0x" + "ee" * 20, 4))
+            return fit(*args)
+
+        monkeypatch.setattr(pumpfun, "fit_anomaly_model", slow_fit)
+        assert await engine.maybe_refit_async(executors)
+        return failed
+
+    try:
+        dirty, refits, needs_refit = asyncio.run(main())
+    finally:
+        executors.shutdown(wait=True)
+    assert (dirty, refits, needs_refit) == (530 + 3, 0, True)
+    assert engine.refits == 1
+    assert engine._dirty == 4
+    assert engine.is_outlier("0x" + "ff" * 20)
+
+
+def test_refit_clears_dirty_rows(bot):
+    engine = engine_with_rows(bot)
+    assert engine.maybe_refit()
+    assert engine._dirty == 0 and not engine.needs_refit()
+    assert engine.is_outlier("0x" + "ff" * 20)
@@ -0,0 +1,60 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+import pumpfun
+from conftest import raw_coin
+
+T0 = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+
+def recording(rows: int = 300) -> list:
+    """Coins recorded five seconds after migrating (as RECORD_PATH sees them), with mixed fundamentals."""
+    payloads = []
+    for i in range(rows):
+        migrated = T0 + timedelta(seconds=20 * i)
+        payload = raw_coin(i, migrated, initialLiquidity=5.0 + i % 50, feePercentage=i % 15, holderCount=i % 200)
+        payload["_observedAt"] = migrated.timestamp() + 5
+        payloads.append(payload)
+    # A coin seen an hour after the last one moves the replay clock past every age limit
+    closing = raw_coin(rows, T0 + timedelta(seconds=20 * rows))
+    closing["_observedAt"] = T0.timestamp() + 20 * rows + 3600
+    payloads.append(closing)
+    return payloads
+
+
+def test_backtest_passes_what_replay_alerts(bot):
+    payloads = recording()
+    replayed = asyncio.run(pumpfun.replay_recording(bot, payloads, batch_size=50))
+    assert replayed["still_too_new"] == 0
+    assert 0 < replayed["alerted"] < len(payloads)
+
+    grid = pumpfun.backtest(bot, payloads)
+    assert grid["passed"].tolist() == [replayed["alerted"]]
+
+
+def test_backtest_age_rule_delays_instead_of_rejecting(bot):
+    payloads = recording(50)
+    prices = {}
+    for payload in payloads:
+        migrated = datetime.fromisoformat(payload["migrationTime"]).timestamp()
+        times = migrated + np.arange(0, 7200, 60, dtype=float)
+        prices[payload["contractAddress"].lower()] = (times, np.full(len(times), 1e-6))
+    grid = pumpfun.backtest(bot, payloads, prices, grid={"block_new_coins_minutes": [0, 10, 30]})
+    # Every setting passes the same coins; each trades once it is old enough
+    assert grid["passed"].nunique() == 1 and grid["passed"].iloc[0] > 0
+    assert (grid["trades"] == grid["passed"]).all()
+
+
+def test_simulate_trades_caps_exposure_per_contract():
+    times = np.arange(0.0, 100.0)
+    flat = (times, np.full(len(times), 1.0))
+    paths = {"a": flat, "b": flat}
+    entries = [("a", 0.0), ("b", 1.0), ("a", 2.0), ("a", 3.0)]
+    returns, skipped = pumpfun.simulate_trades(entries, paths, amount=0.1, slippage=0.0, stop_loss=-0.5,
+                                               take_profit=0.5, max_position=0.25)
+    # "b" does not count against "a"; the third open buy of "a" would exceed 0.25 ETH
+    assert len(returns) == 3 and skipped == 1
+    assert returns == pytest.approx([0.0, 0.0, 0.0])
@@ -0,0 +1,38 @@
+import random
+
+import pumpfun
+
+
+def test_address_set_membership():
+    rng = random.Random(1)
+    keys = [rng.randbytes(20) for _ in range(5000)]
+    members = pumpfun.AddressSet(keys + keys[:10])
+    assert len(members) == 5000
+    assert all(key in members for key in keys)
+    assert not any(rng.randbytes(20) in members for _ in range(5000))
+    assert pumpfun.AddressSet.EMPTY not in members
+
+
+def test_address_set_zero_address():
+    zero = bytes(20)
+    assert zero in pumpfun.AddressSet([zero])
+    assert zero not in pumpfun.AddressSet([b"\x01" * 20])
+    assert zero not in pumpfun.AddressSet()
+    assert len(pumpfun.AddressSet([zero, b"\x01" * 20])) == 2
+
+
+def test_blacklist_store_accepts_any_address_form():
+    address = "0x" + "ab" * 20
+    store = pumpfun.BlacklistStore("test", [bytes.fromhex("ab" * 20)])
+    assert address in store
+    assert address.upper().replace("0X", "0x") in store
+    assert "ab" * 20 in store
+    assert "0x" + "cd" * 20 not in store
+    assert "not an address" not in store
+
+
+def test_bench_blacklist_default_rows():
+    results = pumpfun.bench_blacklist(rows=2000)
+    assert results["lookups"] >= 2000
+    # Every structure answers the same probes the same way
+    assert results["address_set_hits"] == results["store_str_hits"] == results["str_set_hits"] > 0
@@ -0,0 +1,37 @@
+import numpy as np
+
+import pumpfun
+
+
+def test_batch_filters_match_per_coin(bot):
+    coins = [pumpfun._synthetic_coin(i) for i in range(2000)]
+    mask, reasons = bot.apply_filters_batch(pumpfun.CoinRecord.columns(coins))
+    assert mask.tolist() == [bot.apply_filters(coin) for coin in coins]
+    for i, coin in enumerate(coins):
+        failed = [rule for rule, rejected in reasons.items() if rejected[i]]
+        assert (failed[:1] or [None])[0] == bot.filter_reason(coin)
+
+
+def test_batch_filters_reject_missing_values(bot):
+    columns = {
+        "initial_liquidity": np.array([50.0, np.nan]),
+        "creator_fee": np.array([1.0, 1.0]),
+        "holders": np.array([100.0, 100.0]),
+        "migration_time": np.array([0.0, 0.0]),
+    }
+    mask, reasons = bot.apply_filters_batch(columns)
+    assert mask.tolist() == [True, False]
+    assert reasons["min_liquidity"].tolist() == [False, True]
+
+
+def test_rescore_stored_coins(bot):
+    coins = [pumpfun._synthetic_coin(i) for i in range(300)]
+    for coin in coins:
+        bot.save_coins(coin)
+    bot.repository.flush()
+    scored = bot.rescore_stored_coins({"min_holders": 0})
+    assert list(scored.columns) == ["contract_address", "passed", "min_liquidity",
+                                    "max_creator_fee", "min_holders", "block_new_coins_minutes"]
+    assert len(scored) == 300
+    assert not scored["min_holders"].any()
+    assert int(scored["passed"].sum()) == sum(coin.creator_fee <= bot.filters["max_creator_fee"] for coin in coins)
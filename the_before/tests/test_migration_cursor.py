@@ -0,0 +1,65 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pumpfun
+from conftest import raw_coin
+
+MIGRATED = datetime(2024, 5, 1)
+
+
+def recording(count: int, observed_after: timedelta):
+    observed = (MIGRATED + observed_after).timestamp()
+    return [{**raw_coin(i, MIGRATED + timedelta(seconds=i)), "_observedAt": observed} for i in range(count)]
+
+
+def test_too_new_coins_are_retried_once_old_enough(bot):
+    # Seen as they migrate: every coin is younger than BLOCK_NEW_COINS_MINUTES
+    fresh = asyncio.run(pumpfun.replay_recording(bot, recording(20, timedelta(seconds=30))))
+    assert fresh["alerted"] == 0
+    assert fresh["still_too_new"] == 20
+    assert not bot.migration_cursor.seen
+    assert bot.migration_cursor.last_time is None
+
+    # The same coins 15 minutes later are old enough and must not count as duplicates
+    later = asyncio.run(pumpfun.replay_recording(bot, recording(20, timedelta(minutes=15))))
+    assert later["retried"] == 20
+    assert later["alerted"] == 20
+    assert later["still_too_new"] == 0
+    assert len(bot.migration_cursor.seen) == 20
+
+
+def test_deferred_coins_come_back_when_due(bot):
+    cursor = bot.migration_cursor
+    young, old = raw_coin(1), raw_coin(2, MIGRATED + timedelta(seconds=5))
+    assert cursor.admit(young) and cursor.admit(old)
+    eligible_at = MIGRATED.timestamp() + 600
+    cursor.defer(young["contractAddress"], eligible_at)
+    cursor.persisted(old["contractAddress"])
+    cursor.advance([young, old])
+
+    # Waiting coins are neither seen nor admitted twice, and hold the mark back
+    assert not cursor.admit(young)
+    assert cursor.seen == {old["contractAddress"].lower()}
+    assert cursor.last_time == MIGRATED.timestamp()
+    assert cursor.due(eligible_at - 1) == []
+    assert cursor.due(eligible_at) == [young]
+
+    cursor.persisted(young["contractAddress"])
+    cursor.advance([young])
+    assert cursor.last_time == MIGRATED.timestamp() + 5
+    assert not cursor.retry and not cursor.pending
+
+
+def test_restart_resumes_from_the_oldest_waiting_coin(bot):
+    cursor = bot.migration_cursor
+    young, newer = raw_coin(1), raw_coin(2, MIGRATED + timedelta(seconds=5))
+    for raw in (young, newer):
+        assert cursor.admit(raw)
+    cursor.defer(young["contractAddress"], MIGRATED.timestamp() + 600)
+    cursor.advance([young, newer])
+
+    restarted = pumpfun.MigrationCursor(bot.db_engine).load()
+    assert restarted.admit(young)
+    # Rejected for another reason: not retried in this run, but not in the seen-set either
+    assert not cursor.admit(newer)
+    assert newer["contractAddress"].lower() not in cursor.seen
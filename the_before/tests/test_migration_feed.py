@@ -0,0 +1,169 @@
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import pytest
+from aiohttp import web
+
+import pumpfun
+from conftest import raw_coin
+
+ROWS = 60
+
+
+class StandInFeed:
+    """
+    Local REST + WebSocket/SSE migrations source. The stream silently drops
+    one event and refuses connections for the middle third of the run, so
+    the poller has to fail over and the reconciliation sweep has to find
+    the dropped one.
+    """
+
+    def __init__(self, kind: str, rows: int = ROWS):
+        self.kind = kind
+        self.rows = rows
+        self.emitted = []
+        self.clients = set()
+        self.outage = (rows // 3, 2 * rows // 3)
+        self.dropped = rows // 6
+        self.runner = None
+
+    async def start(self) -> int:
+        app = web.Application()
+        app.router.add_get("/migrations", self.migrations)
+        app.router.add_get("/stream", self.websocket if self.kind == "ws" else self.sse)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", 0).start()
+        return self.runner.addresses[0][1]
+
+    async def migrations(self, request):
+        limit = int(request.query.get("limit", 10))
+        offset = int(request.query.get("offset", 0))
+        return web.json_response({"data": self.emitted[::-1][offset:offset + limit]})
+
+    def down(self) -> bool:
+        return self.outage[0] <= len(self.emitted) < self.outage[1]
+
+    async def websocket(self, request):
+        if self.down():
+            return web.Response(status=503)
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.clients.add(ws)
+        try:
+            async for _ in ws:
+                pass
+        finally:
+            self.clients.discard(ws)
+        return ws
+
+    async def sse(self, request):
+        if self.down():
+            return web.Response(status=503)
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resp.prepare(request)
+        queue = asyncio.Queue()
+        self.clients.add(queue)
+        try:
+            while True:
+                raw = await queue.get()
+                if raw is None:
+                    break
+                await resp.write(f"data: {pumpfun.json.dumps(raw)}\n\n".encode())
+        finally:
+            self.clients.discard(queue)
+        return resp
+
+    async def send(self, raw):
+        for client in list(self.clients):
+            if isinstance(client, asyncio.Queue):
+                client.put_nowait(raw)
+            elif not client.closed:
+                await client.send_json(raw)
+
+    async def disconnect(self):
+        for client in list(self.clients):
+            if isinstance(client, asyncio.Queue):
+                client.put_nowait(None)
+            else:
+                await client.close()
+
+    async def emit(self, rate: float = 100.0):
+        for i in range(self.rows):
+            if len(self.emitted) == self.outage[0]:
+                await self.disconnect()
+            # Stamped as it migrates: too new to alert on until BLOCK_NEW_COINS_MINUTES pass
+            raw = raw_coin(i, datetime.now(timezone.utc))
+            self.emitted.append(raw)
+            if i != self.dropped:
+                await self.send(raw)
+            await asyncio.sleep(1 / rate)
+
+    async def stop(self):
+        await self.disconnect()
+        await self.runner.cleanup()
+
+
+async def wait_for(condition, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.02)
+
+
+@pytest.mark.parametrize("kind", ["ws", "sse"])
+def test_stream_failover_dedup_and_alerts(bot, kind, monkeypatch):
+    alerted = Counter()
+    stage_alert = pumpfun.CoinPipeline._stage_alert
+
+    async def record_alert(pipeline, parsed):
+        alerted[parsed.contract_address] += 1
+        return await stage_alert(pipeline, parsed)
+
+    monkeypatch.setattr(pumpfun.CoinPipeline, "_stage_alert", record_alert)
+
+    async def scenario():
+        server = StandInFeed(kind)
+        port = await server.start()
+        scheme = "ws" if kind == "ws" else "http"
+        bot.stream_url = f"{scheme}://127.0.0.1:{port}/stream"
+        bot.api_base = f"http://127.0.0.1:{port}"
+        bot.migration_cursor.window = 300
+        bot.config["API"].update({"POLL_INTERVAL": "1", "FAILOVER_POLL_INTERVAL": "0.1",
+                                  "FETCH_LIMIT": "50", "STREAM_TIMEOUT": "30"})
+        bot.config["RUNTIME"].update({"RESTART_BACKOFF": "0.1", "RESTART_BACKOFF_MAX": "0.5"})
+        offset = 0.0
+        bot.clock = lambda: time.time() + offset
+
+        stop = asyncio.Event()
+        monitor = asyncio.create_task(bot.monitor_coins_loop(stop))
+        try:
+            await wait_for(lambda: bot.feed is not None and bot.feed.stream_up)
+            feed = bot.feed
+            await server.emit()
+            await wait_for(lambda: sum(s["admitted"] for s in map(feed.stats().get, feed.SOURCES)) >= ROWS)
+            # Everything arrived seconds after migrating, so nothing is old enough yet
+            await wait_for(lambda: len(bot.migration_cursor.retry) == ROWS)
+            assert not alerted
+
+            offset = (bot.filters["block_new_coins_minutes"] + 1) * 60
+            await wait_for(lambda: len(alerted) == ROWS)
+            await asyncio.sleep(0.5)  # room for a duplicate alert to show up
+            stats = feed.stats()
+        finally:
+            stop.set()
+            await monitor
+            await server.stop()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert set(alerted) == {raw_coin(i)["contractAddress"].lower() for i in range(ROWS)}
+    assert set(alerted.values()) == {1}
+    assert stats["disconnects"] >= 1
+    assert stats["poll"]["admitted"] >= 1  # failover and the dropped event
+    assert stats["stream"]["admitted"] + stats["poll"]["admitted"] == ROWS
+    assert stats["stream"]["duplicates"] + stats["poll"]["duplicates"] >= 1
+    assert stats["retried"] == ROWS
+    assert len(bot.migration_cursor.seen) == ROWS
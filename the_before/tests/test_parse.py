@@ -0,0 +1,14 @@
+import pumpfun
+
+
+def test_to_checksum_matches_eip55():
+    # Test vectors from EIP-55
+    for address in ("0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed", "0xfB6916095ca1df60bB79Ce92cE3Ea74c37c5d359",
+                    "0xdbF03B407c01E7cD3CBea99509d93f8DDDC8C6FB", "0xD1220A0cf47c7B9Be7A2E6BA89F429762e7b9aDb"):
+        assert pumpfun.to_checksum(address.lower()) == address
+        assert pumpfun.to_checksum.__wrapped__(address.upper().replace("0X", "0x")) == address
+
+
+def test_bench_parse_runs_without_web3():
+    results = pumpfun.bench_parse(rows=500, unique=50)
+    assert results["checksum_parse_per_sec"] > 0 and results["normalized_parse_per_sec"] > 0
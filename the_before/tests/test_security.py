@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+
+from aiohttp import web
+
+import pumpfun
+
+DEADLINE = 0.3
+
+
+class StubThread:
+    """The RugCheck/RPC stand-in on its own loop, so the blocking check can run its own."""
+
+    def __init__(self, app):
+        self.app = app
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        self.runner = web.AppRunner(self.app)
+        asyncio.run_coroutine_threadsafe(self._start(), self.loop).result(5)
+        return f"http://127.0.0.1:{self.runner.addresses[0][1]}"
+
+    async def _start(self):
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", 0).start()
+
+    def __exit__(self, *exc):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+
+
+def configure(bot, base: str, partial_ttl: float = 60):
+    bot.rugcheck_key, bot.rugcheck_url = "key", base + "/rugcheck/{address}"
+    bot.security_deadline = DEADLINE
+    bot.security_rpc = pumpfun.RpcClient(base + "/rpc", timeout=DEADLINE)
+    bot.security_cache.partial_ttl = partial_ttl
+
+
+def test_slow_rpc_gives_a_partial_result_within_the_deadline(bot):
+    app, requests = pumpfun._security_stub_app(rpc_delay=2.0)
+    coin = pumpfun._synthetic_coin(1)
+    with StubThread(app) as base:
+        configure(bot, base, partial_ttl=0.5)
+        started = time.monotonic()
+        result = bot.perform_security_checks(coin)
+        elapsed = time.monotonic() - started
+        assert elapsed < 2 * DEADLINE
+        assert result["complete"] is False
+        assert result["rugcheck_verdict"] == "Warning" and result["rugcheck_score"] == 12
+        assert result["top_holder_percent"] is None and result["is_bundled"] is None
+
+        # Partial rows are served from the cache only for PARTIAL_TTL
+        assert bot.perform_security_checks(coin) is result
+        assert requests["rugcheck"] == 1
+        time.sleep(0.6)
+        assert bot.perform_security_checks(coin)["complete"] is False
+        assert requests["rugcheck"] == 2
+
+
+def test_complete_result_is_cached(bot):
+    app, requests = pumpfun._security_stub_app()
+    coin = pumpfun._synthetic_coin(2)
+
+    async def main(base):
+        configure(bot, base)
+        await bot.open_http_session()
+        try:
+            first = await bot.perform_security_checks_async(coin)
+            second = await bot.perform_security_checks_async(coin)
+        finally:
+            await bot.close_http_session()
+        return first, second
+
+    with StubThread(app) as base:
+        first, second = asyncio.run(main(base))
+    assert first["complete"] is True and second is first
+    assert first["top_holder_percent"] > 0 and first["is_bundled"] is not None
+    assert requests == {"rugcheck": 1, "rpc": 2}
+
+
+def test_slow_rugcheck_keeps_the_holder_checks(bot):
+    app, requests = pumpfun._security_stub_app(rugcheck_delay=2.0)
+    coin = pumpfun._synthetic_coin(3)
+
+    async def main(base):
+        configure(bot, base)
+        await bot.open_http_session()
+        try:
+            started = time.monotonic()
+            result = await bot.perform_security_checks_async(coin)
+            return result, time.monotonic() - started
+        finally:
+            await bot.close_http_session()
+
+    with StubThread(app) as base:
+        result, elapsed = asyncio.run(main(base))
+    assert elapsed < 2 * DEADLINE
+    assert result["complete"] is False and result["rugcheck_verdict"] is None
+    assert result["top_holder_percent"] is not None
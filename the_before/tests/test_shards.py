@@ -0,0 +1,87 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import pumpfun
+from conftest import raw_coin
+
+T0 = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+
+def recording(rows: int = 120) -> list:
+    """Coins seen an hour after migrating, with mixed fundamentals so only some pass the filters."""
+    payloads = []
+    for i in range(rows):
+        migrated = T0 + timedelta(seconds=20 * i)
+        payload = raw_coin(i, migrated, initialLiquidity=5.0 + i % 50, feePercentage=i % 15, holderCount=i % 200)
+        payload["_observedAt"] = migrated.timestamp() + 3600
+        payloads.append(payload)
+    return payloads
+
+
+def replay(workdir, payloads, shards: int, on_batch=None) -> tuple:
+    """replay_recording on a fresh bot; `on_batch(pipeline, n)` runs before the n-th batch is processed."""
+    workdir.mkdir()
+    bot = pumpfun._bench_bot(str(workdir))
+    pipelines = []
+    build = bot.build_pipeline
+
+    def build_pipeline(n):
+        pipeline = build(n)
+        if on_batch is not None:
+            process = pipeline.process
+
+            async def process_with_hook(raw_coins):
+                on_batch(pipeline, pipeline.batches + 1)
+                await process(raw_coins)
+
+            pipeline.process = process_with_hook
+        pipelines.append(pipeline)
+        return pipeline
+
+    bot.build_pipeline = build_pipeline
+    try:
+        result = asyncio.run(pumpfun.replay_recording(bot, payloads, batch_size=40, shards=shards))
+    finally:
+        bot.executors.shutdown(wait=False)
+        bot.db_engine.dispose()
+    return result, pipelines[0]
+
+
+def counts(result) -> tuple:
+    return result["db"]["coins_after"], result["db"]["security_checks_after"], result["alerted"]
+
+
+@pytest.fixture(scope="module")
+def single(tmp_path_factory):
+    payloads = recording()
+    result, _ = replay(tmp_path_factory.mktemp("single") / "bot", payloads, shards=0)
+    return payloads, result
+
+
+def test_sharded_replay_matches_single_process(single, tmp_path):
+    payloads, expected = single
+    assert 0 < expected["alerted"] < len(payloads)
+    assert expected["db"]["security_checks_after"] == len(payloads)
+
+    result, pipeline = replay(tmp_path / "sharded", payloads, shards=2)
+    assert counts(result) == counts(expected)
+    assert result["admitted"] == expected["admitted"] == len(payloads)
+    assert pipeline.restarts == 0
+
+
+def test_dead_shard_is_respawned_and_its_coins_resent(single, tmp_path):
+    payloads, expected = single
+    killed = []
+
+    def kill_shard(pipeline, batch):
+        if batch == 2:
+            process = pipeline.processes[0]
+            process.kill()
+            process.join(10)
+            killed.append(process.pid)
+
+    result, pipeline = replay(tmp_path / "sharded", payloads, shards=2, on_batch=kill_shard)
+    assert killed and pipeline.restarts == 1
+    assert counts(result) == counts(expected)
@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+
+import aiohttp
+from aiohttp import web
+from sqlalchemy import text
+
+import pumpfun
+from conftest import serve
+
+
+class MockTwitter:
+    """Profiles and timelines for any handle; a timeline grows by two posts per request."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.requests = []
+        self.next_id = 1000
+
+    async def profile(self, request):
+        handle = request.match_info["handle"]
+        self.requests.append(("profile", handle, None))
+        await asyncio.sleep(self.delay)
+        return web.json_response({"username": handle, "followers_count": 12000, "following_count": 10,
+                                  "verified": handle == "verified", "created_at": "2020-01-01T00:00:00Z"})
+
+    async def tweets(self, request):
+        handle = request.match_info["handle"]
+        since_id = request.query.get("since_id")
+        self.requests.append(("tweets", handle, since_id))
+        await asyncio.sleep(self.delay)
+        posts = []
+        for _ in range(2):
+            self.next_id += 1
+            posts.append({"id": str(self.next_id), "text": f"{handle} to the moon, great project",
+                          "created_at": pumpfun._utcnow().isoformat(), "like_count": 3, "retweet_count": 1})
+        return web.json_response({"data": posts, "meta": {"newest_id": posts[-1]["id"]}})
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/users/{handle}", self.profile)
+        app.router.add_get("/users/{handle}/tweets", self.tweets)
+        return app
+
+
+def coin(i: int, handle: str) -> pumpfun.CoinRecord:
+    record = pumpfun._synthetic_coin(i)
+    record.twitter_handle = handle
+    record.migration_time = int(time.time())
+    return record
+
+
+def query(bot, sql):
+    with bot.db_engine.connect() as conn:
+        return conn.execute(text(sql)).fetchall()
+
+
+def run_collector(bot, scenario, delay: float = 0.0, rate_limit: int = 600):
+    twitter = MockTwitter(delay)
+
+    async def main():
+        runner, url = await serve(twitter.app())
+        collector = pumpfun.SocialCollector(bot, url, "key", rate_limit=rate_limit, flush_interval=3600)
+        async with aiohttp.ClientSession() as session:
+            await collector.start(session)
+            try:
+                await scenario(collector)
+            finally:
+                await collector.stop()
+                await runner.cleanup()
+        return collector
+
+    return asyncio.run(main()), twitter
+
+
+def test_collects_metrics_posts_and_social_score(bot):
+    coins = [coin(1, "alpha"), coin(2, "alpha"), coin(3, "verified")]
+    for record in coins:
+        bot.save_coins(record)
+    bot.repository.flush()
+
+    async def scenario(collector):
+        for record in coins:
+            collector.submit(record)
+        await collector.queue.join()
+
+    collector, twitter = run_collector(bot, scenario)
+    # One profile + one timeline request per handle, not per coin
+    assert sorted(kind for kind, _, _ in twitter.requests) == ["profile", "profile", "tweets", "tweets"]
+    metrics = query(bot, "SELECT coin_address, twitter_handle, follower_count, verified FROM twitter_metrics")
+    assert {(row[0].lower(), row[1]) for row in metrics} == {
+        (record.contract_address, record.twitter_handle) for record in coins
+    }
+    assert len(query(bot, "SELECT post_id FROM twitter_posts")) == 4
+    scores = query(bot, "SELECT social_score FROM coins")
+    assert len(scores) == 3 and all(row[0] is not None and row[0] > 0 for row in scores)
+
+
+def test_coalesces_lookups_and_fetches_incrementally(bot):
+    async def scenario(collector):
+        await asyncio.gather(*(collector.lookup("alpha") for _ in range(5)))
+        await collector.lookup("alpha")
+
+    collector, twitter = run_collector(bot, scenario, delay=0.05)
+    assert collector.coalesced == 4
+    timelines = [since_id for kind, _, since_id in twitter.requests if kind == "tweets"]
+    assert timelines == [None, "1002"]
+
+
+def test_rate_limit_is_shared_across_handles(bot):
+    async def scenario(collector):
+        collector.bucket.capacity = collector.bucket.tokens = 4
+        started = time.monotonic()
+        await asyncio.gather(*(collector.lookup(f"handle{i}") for i in range(4)))
+        scenario.elapsed = time.monotonic() - started
+
+    # 4 requests/second with a burst of 4: 8 requests need about one second
+    _, twitter = run_collector(bot, scenario, rate_limit=240)
+    assert len(twitter.requests) == 8
+    assert scenario.elapsed >= 0.9
+
+
+def test_posts_fetched_during_a_flush_are_kept(bot):
+    release = threading.Event()
+
+    async def scenario(collector):
+        write = collector.write
+
+        def slow_write(*args):
+            release.wait(5)
+            return write(*args)
+
+        collector.write = slow_write
+        collector.coins_by_handle = {"alpha": {coin(1, "alpha").contract_address: time.time()},
+                                     "beta": {coin(2, "beta").contract_address: time.time()}}
+        await collector.lookup("alpha")
+        flushing = asyncio.create_task(collector.flush())
+        await asyncio.sleep(0.05)  # the write is now blocked on its IO thread
+        await collector.lookup("beta")
+        release.set()
+        await flushing
+
+    run_collector(bot, scenario)
+    assert len(query(bot, "SELECT post_id FROM twitter_posts")) == 4
+    assert len(query(bot, "SELECT coin_address FROM twitter_metrics")) == 2
@@ -0,0 +1,15 @@
+import pumpfun
+
+
+def test_startup_stays_within_budget():
+    results = pumpfun.bench_startup(rows=1)
+    assert results["lazy_modules_loaded"] == [], f"imported at startup: {results['lazy_modules_loaded']}"
+    assert results["rss_mb"] <= pumpfun.STARTUP_RSS_BUDGET_MB, \
+        f"startup RSS {results['rss_mb']:.0f}MB over the {pumpfun.STARTUP_RSS_BUDGET_MB}MB budget"
+    assert results["import_ms"] is not None
+
+
+def test_bench_startup_reports_instead_of_failing(monkeypatch):
+    monkeypatch.setattr(pumpfun, "LAZY_MODULES", ("json",))
+    results = pumpfun.bench_startup(rows=1)
+    assert results["lazy_modules_loaded"] == ["json"]
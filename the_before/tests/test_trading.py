@@ -0,0 +1,286 @@
+import asyncio
+import time
+
+import pytest
+import rlp
+from aiohttp import web
+from eth_account import Account
+from sqlalchemy import text
+
+import pumpfun
+from conftest import serve
+
+PRIVATE_KEY = "0x" + "11" * 32
+ROUTER = "0x" + "7a" * 20
+WETH = "0x" + "c0" * 20
+TOKEN = "0x" + "ab" * 20
+PAIR = "0x" + "0" * 24 + "ee" * 20
+START_NONCE = 7
+TOKENS_PER_ETH = 1000
+MULTICALL = "0x" + "ca" * 20
+FACTORY = "0x" + "fa" * 20
+
+
+def word(value: int) -> str:
+    return "0x" + pumpfun.abi_encode(["uint256"], [value]).hex()
+
+
+class DevChain:
+    """
+    JSON-RPC stand-in for a local dev chain: answers the executor's state and
+    quote calls and the position monitor's Multicall3 reads, accepts raw
+    transactions after a short delay (so concurrent buys overlap), mints
+    TOKENS_PER_ETH per ETH in each buy's receipt and pays sells out of the
+    pair's reserves (or reverts the next `revert_sells` of them).
+    """
+
+    def __init__(self, wallet: str, send_delay: float = 0.05):
+        self.wallet = wallet
+        self.send_delay = send_delay
+        self.reject = False
+        self.revert_sells = 0
+        self.sent = []  # raw transactions, in arrival order
+        self.sells = []  # token of each sell, in arrival order
+        self.requests = 0  # HTTP requests; a batch counts once
+        self.balances = {}  # token -> raw units held by the wallet
+        self.pairs = {}  # token -> pair address
+        self.reserves = {}  # pair -> (token reserve, WETH reserve); tokens sort below WETH
+        self.receipts = {}  # tx hash -> receipt
+
+    def call(self, tx: dict) -> str:
+        data = tx["data"]
+        selector = bytes.fromhex(data[2:10])
+        if selector == pumpfun.TradeExecutor.DECIMALS:
+            return word(18)
+        if selector == pumpfun.TradeExecutor.BALANCE_OF:
+            return word(self.balances.get(tx["to"], 0))
+        if selector == pumpfun.TradeExecutor.ALLOWANCE:
+            return word(pumpfun.MAX_UINT256)
+        if selector == pumpfun.TradeExecutor.GET_AMOUNTS_OUT:
+            amount_in, _ = pumpfun.abi_decode(["uint256", "address[]"], bytes.fromhex(data[10:]))
+            return "0x" + pumpfun.abi_encode(["uint256[]"], [[amount_in, amount_in * TOKENS_PER_ETH]]).hex()
+        if selector == pumpfun.PositionMonitor.FACTORY:
+            return word(int(FACTORY, 16))
+        if selector == pumpfun.PositionMonitor.AGGREGATE3:
+            (calls,) = pumpfun.abi_decode(["(address,bool,bytes)[]"], bytes.fromhex(data[10:]))
+            results = [(True, self.inner(target.lower(), inner)) for target, _, inner in calls]
+            return "0x" + pumpfun.abi_encode(["(bool,bytes)[]"], [results]).hex()
+        raise ValueError(f"unexpected eth_call {data[:10]}")
+
+    def inner(self, target: str, data: bytes) -> bytes:
+        """One call inside an aggregate3."""
+        selector = data[:4]
+        if selector == pumpfun.PositionMonitor.GET_PAIR:
+            token, _ = pumpfun.abi_decode(["address", "address"], data[4:])
+            return pumpfun.abi_encode(["address"], [self.pairs.get(token.lower(), pumpfun.ZERO_ADDRESS)])
+        if selector == pumpfun.TradeExecutor.DECIMALS:
+            return pumpfun.abi_encode(["uint256"], [18])
+        if selector == pumpfun.PositionMonitor.GET_RESERVES:
+            return pumpfun.abi_encode(["uint112", "uint112", "uint32"], [*self.reserves[target], 0])
+        raise ValueError(f"unexpected call {selector.hex()} to {target}")
+
+    def price(self, token: str, eth_per_token: float):
+        self.reserves[self.pairs[token]] = (10**24, int(eth_per_token * 10**24))
+
+    def receipt(self, raw: str) -> dict:
+        """Execute a signed swap against the stand-in state and return its receipt."""
+        fields = rlp.decode(bytes.fromhex(raw[4:]))  # type-2 envelope
+        value, data = int.from_bytes(fields[6], "big"), fields[7]
+        receipt = {"status": "0x1", "gasUsed": hex(150000), "blockNumber": hex(17), "logs": []}
+        if data[:4] == pumpfun.TradeExecutor.BUY:
+            tokens = value * TOKENS_PER_ETH
+            self.balances[TOKEN] = self.balances.get(TOKEN, 0) + tokens
+            receipt["logs"].append({"address": TOKEN, "data": word(tokens),
+                                    "topics": [pumpfun.TRANSFER_TOPIC, PAIR, "0x" + "0" * 24 + self.wallet[2:]]})
+        elif data[:4] == pumpfun.TradeExecutor.SELL:
+            units, _, path, _, _ = pumpfun.abi_decode(["uint256", "uint256", "address[]", "address", "uint256"],
+                                                      data[4:])
+            token = path[0].lower()
+            self.sells.append(token)
+            if self.revert_sells:
+                self.revert_sells -= 1
+                receipt["status"] = "0x0"
+                return receipt
+            reserve_token, reserve_weth = self.reserves[self.pairs[token]]
+            out = units * 997 * reserve_weth // (reserve_token * 1000 + units * 997)
+            self.balances[token] -= units
+            receipt["logs"].append({"address": WETH, "data": word(out),
+                                    "topics": [pumpfun.WITHDRAWAL_TOPIC, "0x" + "0" * 24 + ROUTER[2:]]})
+        return receipt
+
+    async def answer(self, request: dict) -> dict:
+        method, params = request["method"], request["params"]
+        if method == "eth_chainId":
+            result = hex(1337)
+        elif method == "eth_getTransactionCount":
+            result = hex(START_NONCE + len(self.sent))
+        elif method == "eth_getBlockByNumber":
+            result = {"number": hex(16), "baseFeePerGas": hex(10**9)}
+        elif method == "eth_gasPrice":
+            result = hex(3 * 10**9)
+        elif method == "eth_call":
+            result = self.call(params[0])
+        elif method == "eth_sendRawTransaction" and self.reject:
+            return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32000, "message": "nonce too low"}}
+        elif method == "eth_sendRawTransaction":
+            await asyncio.sleep(self.send_delay)
+            raw = params[0]
+            assert Account.recover_transaction(raw).lower() == self.wallet
+            tx_hash = "0x" + pumpfun.keccak256(bytes.fromhex(raw[2:])).hex()
+            self.sent.append(raw)
+            self.receipts[tx_hash] = self.receipt(raw)
+            result = tx_hash
+        elif method == "eth_getTransactionReceipt":
+            result = self.receipts.get(params[0])
+        else:
+            return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32601, "message": method}}
+        return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+
+    async def handle(self, request):
+        self.requests += 1
+        payload = await request.json()
+        if isinstance(payload, list):
+            return web.json_response([await self.answer(item) for item in payload])
+        return web.json_response(await self.answer(payload))
+
+
+def run_trader(bot, scenario, **kwargs):
+    chain = DevChain(Account.from_key(PRIVATE_KEY).address.lower())
+
+    async def main():
+        app = web.Application()
+        app.router.add_post("/", chain.handle)
+        runner, url = await serve(app)
+        rpc = pumpfun.RpcClient(url)
+        trader = pumpfun.TradeExecutor(bot, rpc, PRIVATE_KEY, ROUTER, WETH, **kwargs)
+        try:
+            await trader.refresh()
+            result = await scenario(trader, chain)
+        finally:
+            await rpc.close()
+            await runner.cleanup()
+        return trader, chain, result
+
+    return asyncio.run(main())
+
+
+def test_concurrent_buys_respect_max_position(bot):
+    async def scenario(trader, chain):
+        return await asyncio.gather(*(trader.buy(TOKEN, 0.1) for _ in range(5)), return_exceptions=True)
+
+    trader, chain, results = run_trader(bot, scenario, max_position=0.25)
+    trades = [r for r in results if isinstance(r, dict)]
+    refused = [r for r in results if isinstance(r, ValueError)]
+    assert len(trades) == 2 and len(refused) == 3
+    assert len(chain.sent) == 2
+    assert sorted(t["nonce"] for t in trades) == [START_NONCE, START_NONCE + 1]
+    assert trader._committed(TOKEN) == pytest.approx(0.2)
+
+
+def test_presigned_buy_is_sent_and_filled(bot):
+    async def scenario(trader, chain):
+        trader.watch(TOKEN)
+        await trader.refresh()
+        assert trader._presigned is not None
+        trade = await trader.buy(TOKEN, 0.1)
+        await trader.record_fills()
+        return trade
+
+    trader, chain, trade = run_trader(bot, scenario)
+    assert trader.presigned_hits == 1
+    assert chain.sent and trade["tx_hash"] == "0x" + pumpfun.keccak256(bytes.fromhex(chain.sent[0][2:])).hex()
+    assert trader.positions[TOKEN] == [pytest.approx(100.0), pytest.approx(0.1)]
+    with bot.db_engine.connect() as conn:
+        rows = conn.execute(text("SELECT direction, status, nonce, token_amount FROM trades")).fetchall()
+    assert [tuple(row) for row in rows] == [("buy", "filled", START_NONCE, pytest.approx(100.0))]
+
+
+def test_failed_send_releases_the_reservation(bot):
+    async def scenario(trader, chain):
+        chain.reject = True
+        with pytest.raises(pumpfun.RpcError):
+            await trader.buy(TOKEN, 0.2)
+        chain.reject = False
+        return await trader.buy(TOKEN, 0.2)
+
+    trader, chain, trade = run_trader(bot, scenario, max_position=0.25)
+    assert trade["nonce"] == START_NONCE and len(chain.sent) == 1
+    assert trader._committed(TOKEN) == pytest.approx(0.2)
+
+
+def holding(chain, trader, count: int):
+    """`count` positions of 100 tokens bought for 0.1 ETH each, priced at cost."""
+    tokens = [f"0x{0xa0 + i:02x}" + f"{i:02x}" * 19 for i in range(count)]
+    for i, token in enumerate(tokens):
+        chain.pairs[token] = f"0x{0x50 + i:02x}" + "55" * 19
+        chain.balances[token] = 100 * 10**18
+        chain.price(token, 0.001 / 0.997)
+        trader.positions[token] = [100.0, 0.1]
+    return tokens
+
+
+async def head(monitor):
+    await monitor.evaluate(time.perf_counter())
+    await monitor.drain()
+
+
+def test_monitor_reads_every_position_in_one_batch_per_head(bot):
+    async def scenario(trader, chain):
+        tokens = holding(chain, trader, 25)
+        monitor = pumpfun.PositionMonitor(trader, multicall=MULTICALL, batch_size=10)
+        await head(monitor)  # first sight also resolves pairs and decimals
+        per_head = []
+        for _ in range(3):
+            before = chain.requests
+            await head(monitor)
+            per_head.append(chain.requests - before)
+        return monitor, tokens, per_head
+
+    _, chain, (monitor, tokens, per_head) = run_trader(bot, scenario)
+    assert per_head == [1, 1, 1]
+    assert set(monitor.pnl) == set(tokens)
+    assert all(abs(pnl) < 0.01 for pnl in monitor.pnl.values())
+    assert not chain.sells
+
+
+def test_monitor_exits_each_crossing_once(bot):
+    async def scenario(trader, chain):
+        losing, winning, flat = holding(chain, trader, 3)
+        monitor = pumpfun.PositionMonitor(trader, multicall=MULTICALL, stop_loss=-0.15, take_profit=0.3)
+        await head(monitor)
+        chain.price(losing, 0.0008)
+        chain.price(winning, 0.0014)
+        await head(monitor)
+        await head(monitor)  # exits are in flight: nothing is sold again
+        await trader.record_fills()
+        await head(monitor)  # exited: the positions are gone
+        return monitor, (losing, winning, flat)
+
+    trader, chain, (monitor, (losing, winning, flat)) = run_trader(bot, scenario)
+    assert sorted(chain.sells) == sorted([losing, winning])
+    assert monitor.exits == 2 and trader.fills == 2
+    assert set(monitor.pnl) == {flat}
+    assert trader.positions[losing][0] == 0 and trader.positions[winning][0] == 0
+
+
+def test_monitor_retries_a_reverted_exit(bot):
+    async def scenario(trader, chain):
+        (token,) = holding(chain, trader, 1)
+        # The watched coin's token state is cached: a revert must not leave it stale
+        trader.watch(token)
+        await trader.refresh()
+        monitor = pumpfun.PositionMonitor(trader, multicall=MULTICALL)
+        chain.revert_sells = 1
+        chain.price(token, 0.0005)
+        await head(monitor)
+        await trader.record_fills()
+        await head(monitor)
+        await trader.record_fills()
+        await head(monitor)
+        return monitor, token
+
+    trader, chain, (monitor, token) = run_trader(bot, scenario)
+    assert chain.sells == [token, token]
+    assert trader.reverts == 1 and trader.fills == 1
+    assert monitor.exits == 2
+    assert trader.positions[token][0] == 0
@@ -0,0 +1,46 @@
+import pytest
+
+import pumpfun
+
+VERIFIED = {"status": "1", "message": "OK", "result": "[{\"type\":\"function\"}]"}
+NOT_VERIFIED = {"status": "0", "message": "NOTOK", "result": "Contract source code not verified"}
+RATE_LIMITED = {"status": "0", "message": "NOTOK", "result": "Max rate limit reached"}
+
+
+class FakeEtherscan:
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def get(self, url, timeout=None):
+        self.calls += 1
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return type("Response", (), {"json": lambda _: reply})()
+
+
+@pytest.mark.parametrize("reply, expected", [(VERIFIED, True), (NOT_VERIFIED, False), (RATE_LIMITED, None),
+                                             ({"status": "0", "result": "Invalid API Key"}, None), ({}, None)])
+def test_verification_result(reply, expected):
+    assert pumpfun.PumpFunBot._verification_result(reply) is expected
+
+
+def test_errors_are_not_cached(bot, monkeypatch):
+    bot.config["API"]["ETHERSCAN_KEY"] = "key"
+    address = "0x" + "ab" * 20
+    etherscan = FakeEtherscan(RATE_LIMITED, TimeoutError("slow"), NOT_VERIFIED, VERIFIED)
+    monkeypatch.setattr(pumpfun.requests, "get", etherscan.get)
+    assert bot.check_contract_verification_cached(address) is None
+    assert bot.check_contract_verification_cached(address) is None
+    assert bot.verification_cache.get(address) is None
+    assert bot.check_contract_verification_cached(address) is False
+    # A real "not verified" is cached for VERIFICATION_TTL
+    assert bot.check_contract_verification_cached(address) is False
+    assert etherscan.calls == 3
+
+
+def test_no_key_means_unknown(bot, monkeypatch):
+    bot.config["API"]["ETHERSCAN_KEY"] = ""
+    monkeypatch.setattr(pumpfun.requests, "get", FakeEtherscan().get)
+    assert bot.check_contract_verification_cached("0x" + "ab" * 20) is None